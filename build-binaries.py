@@ -1,6 +1,7 @@
 import os
 import subprocess
 import platform
+from concurrent.futures import ThreadPoolExecutor
 
 # Define configurations for each platform
 targets = [
@@ -11,6 +12,9 @@ targets = [
 
 script_name = "main.py"
 output_dir = "bin"
+src_dir = os.path.abspath(os.getcwd())
+# Split the host CPUs between the containers that run in parallel
+cpus_per_build = max(1, (os.cpu_count() or 1) // len(targets))
 
 # Create the output directory
 if not os.path.exists(output_dir):
@@ -18,19 +22,35 @@ if not os.path.exists(output_dir):
 
 def build_binary(target):
     print(f"Building for {target['name']}...")
+    # Give each target its own dist and build directories so parallel containers don't overwrite each other
+    dist_dir = f"dist-{target['name'].lower()}"
+    build_dir = f"build-{target['name'].lower()}"
+    # Unlike -v, --mount does not create missing source directories
+    os.makedirs(dist_dir, exist_ok=True)
+    os.makedirs(build_dir, exist_ok=True)
+    # Docker can't create the mountpoints inside the read-only source mount
+    os.makedirs(os.path.join(src_dir, "dist"), exist_ok=True)
+    os.makedirs(os.path.join(src_dir, "build"), exist_ok=True)
     try:
         # Run Docker container for the specified platform
         subprocess.run([
             "docker", "run", "--rm",
-            "-v", os.getcwd() + ":/src",
+            "--pull=missing",
+            f"--cpus={cpus_per_build}",
+            # Read-only so the parallel containers can't touch the shared tree, outputs go to the mounts below
+            "--mount", f"type=bind,src={src_dir},dst=/src,readonly",
+            "--mount", f"type=bind,src={os.path.join(src_dir, dist_dir)},dst=/src/dist",
+            "--mount", f"type=bind,src={os.path.join(src_dir, build_dir)},dst=/src/build",
             target["image"],
             "--onefile",
+            # Keep the generated spec in the per-target build mount, parallel builds would share /src/main.spec
+            "--specpath", "/src/build",
             f"/src/{script_name}"
         ], check=True)
 
         # Move the binary to the output directory
         binary_name = os.path.splitext(script_name)[0] + target["extension"]
-        src_binary = os.path.join("dist", binary_name)
+        src_binary = os.path.join(dist_dir, binary_name)
         dest_binary = os.path.join(output_dir, f"{binary_name}_{target['name'].lower()}")
         os.rename(src_binary, dest_binary)
         print(f"Built {dest_binary}")
@@ -50,8 +70,9 @@ def main():
         print("Docker is not installed. Please install Docker and try again.")
         return
 
-    for target in targets:
-        build_binary(target)
+    # Each build runs in its own container, so build all platforms at once
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        list(executor.map(build_binary, targets))
 
     print(f"All binaries are saved in the '{output_dir}' directory.")
 
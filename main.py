@@ -1,35 +1,66 @@
-import json
+import atexit
 import logging as log
+import os
+import queue
 import threading
 import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
 
 import click
+import orjson
+import requests
 import yaml
-from jenkins import Jenkins
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
 from rich.live import Live
 from rich.table import Table
-
-RETRIES_COUNT_GET_BUILD_STAGE = 20
-RETRIES_INTERVAL_SECONDS_GET_BUILD_STAGE = 2
-INTERVAL_SECONDS_REFRESH_BUILD = 2
+from rich.text import Text
+from sseclient import SSEClient
+from urllib3.util.retry import Retry
+
+TIMEOUT_SECONDS_START_BUILD = 40
+INTERVAL_SECONDS_REFRESH_BUILD = 1
+MAX_INTERVAL_SECONDS_REFRESH_BUILD = 30
+RETRIES_COUNT_JENKINS_REQUEST = 3
+TIMEOUT_SECONDS_JENKINS_REQUEST = 10
+TERMINAL_STATUSES = ('SUCCESS', 'FAILED', 'ABORTED')
+BUILD_STAGES_TREE = 'status,durationMillis,stages[name]'
+# Run and stage transitions per SSE Gateway channel, with the event field holding the job name
+BUILD_EVENTS = {
+    'job': ('job_name', ('job_run_started', 'job_run_ended')),
+    'pipeline': ('pipeline_job_name', ('pipeline_stage', 'pipeline_end')),
+}
+WORKER_THREADS = int(os.environ.get('JBT_SUBMIT_THREADS', '8'))
 
 log_directory = Path.home() / 'jenkins-bt-logs'
 log_directory.mkdir(parents=True, exist_ok=True)
 
-# Configure logging
+# Configure logging, the file is written by a background listener to keep I/O off the polling threads
+log_queue = queue.Queue(-1)
+log_file_handler = RotatingFileHandler(
+    log_directory / "build.log", maxBytes=1000000, backupCount=2  # 1MB max, keep 2 backups
+)
+log_file_handler.setFormatter(log.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+log_listener = QueueListener(log_queue, log_file_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 log.basicConfig(
     level=log.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        RotatingFileHandler(
-            log_directory / "build.log", maxBytes=1000000, backupCount=2  # 1MB max, keep 2 backups
-        )
-    ]
+    format="%(message)s",  # Final formatting happens in log_file_handler
+    handlers=[QueueHandler(log_queue)]
 )
 
+# Shared by every phase for submitting and polling jobs, so the thread count stays bounded
+executor = ThreadPoolExecutor(max_workers=WORKER_THREADS)
+
 
 class BuildStatus(Enum):
     IN_PROGRESS = 1
@@ -38,50 +69,143 @@ class BuildStatus(Enum):
 
 
 class Node:
+    __slots__ = ('name', 'inbound', 'children', '_hash')
+
     def __init__(self, name: str):
         self.name = name
         self.inbound = 0
         self.children: list[Node] = []
+        self._hash = hash(name)
 
     def __eq__(self, other):
-        return self.name == other.name
+        return self is other or (isinstance(other, Node) and self.name == other.name)
 
     def __hash__(self):
-        return hash(self.name)
+        return self._hash
 
     def __repr__(self):
         return f"name={self.name}, inbound={self.inbound}, children={[n.name for n in self.children]}"
 
 
 class BuildItem:
+    __slots__ = ('job_name', 'build_num', 'status', 'stage', 'duration', 'poll_interval', 'next_poll_time',
+                 'start_deadline')
+
     def __init__(self):
         self.job_name = ""
         self.build_num = 0
         self.status = ""
         self.stage = ""
         self.duration = 0
+        self.poll_interval = INTERVAL_SECONDS_REFRESH_BUILD
+        self.next_poll_time = 0
+        self.start_deadline = 0
 
     def __repr__(self):
         return f"job_name={self.job_name}, build_num={self.build_num}, status={self.status}, stage={self.stage}, duration={self.duration}s"
 
 
 class Authentication:
+    __slots__ = ('username', 'api_token')
+
     def __init__(self):
         self.username = ""
         self.api_token = ""
 
 
 class Config:
-    auth = Authentication()
-    endpoint = ""
-    aliases: dict[str, str] = {}
-    dependencies: list[list[int]] = []
-
+    __slots__ = ('auth', 'endpoint', 'aliases', 'dependencies')
 
-def build_graph(aliases: dict[str, str], dependencies: list[list[int]]) -> dict[str, str]:
-    name_node_mapping = {}
-    for alias in aliases.keys():
-        name_node_mapping.setdefault(alias, Node(alias))
+    def __init__(self):
+        self.auth = Authentication()
+        self.endpoint = ""
+        self.aliases: dict[str, str] = {}
+        self.dependencies: list[tuple[str, str]] = []
+
+
+class JenkinsClient:
+    def __init__(self, endpoint: str, auth: Authentication):
+        self.endpoint = endpoint.rstrip('/')
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(auth.username, auth.api_token)
+        self.session.headers['Accept'] = 'application/json'
+
+        # One keep-alive connection per worker thread, so concurrent polls reuse connections instead of reopening them
+        adapter = HTTPAdapter(pool_maxsize=WORKER_THREADS,
+                              max_retries=Retry(total=RETRIES_COUNT_JENKINS_REQUEST, backoff_factor=0.3))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Conditional request headers of the last stage info response, keyed by (job name, build number)
+        self.stage_validators: dict[tuple[str, int], dict[str, str]] = {}
+
+    def job_url(self, job_name: str) -> str:
+        # Jobs inside folders are addressed as "folder/job"
+        return self.endpoint + ''.join(f"/job/{quote(part, safe='')}" for part in job_name.split('/'))
+
+    def next_build_num(self, job_name: str) -> int:
+        response = self.session.get(f"{self.job_url(job_name)}/api/json", params={'tree': 'nextBuildNumber'},
+                                    timeout=TIMEOUT_SECONDS_JENKINS_REQUEST)
+        response.raise_for_status()
+        return orjson.loads(response.content)['nextBuildNumber']
+
+    def build_stages(self, job_name: str, build_num: int) -> Optional[dict[str, str]]:
+        # None means the stage info has not changed since the previous call
+        key = (job_name, build_num)
+        # Ask only for the fields used by update_build_item_from_stage_info
+        response = self.session.get(f"{self.job_url(job_name)}/{build_num}/wfapi/describe",
+                                    params={'tree': BUILD_STAGES_TREE},
+                                    headers=self.stage_validators.get(key),
+                                    timeout=TIMEOUT_SECONDS_JENKINS_REQUEST)
+        if response.status_code == 304:
+            return None
+        if response.status_code == 404:
+            # The build is still queued
+            return {}
+        response.raise_for_status()
+
+        validators = {}
+        if 'ETag' in response.headers:
+            validators['If-None-Match'] = response.headers['ETag']
+        if 'Last-Modified' in response.headers:
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+        self.stage_validators[key] = validators
+        return orjson.loads(response.content)
+
+    def build_job(self, job_name: str):
+        self.session.post(f"{self.job_url(job_name)}/build", timeout=TIMEOUT_SECONDS_JENKINS_REQUEST).raise_for_status()
+
+    def build_events(self, job_names: set[str]):
+        # Yields (channel, event) for run and stage transitions of the given jobs pushed by the SSE Gateway plugin,
+        # raises if the plugin is not available
+        client_id = f"jenkins-bt-{uuid.uuid4().hex}"
+        self.session.get(f"{self.endpoint}/sse-gateway/connect", params={'clientId': client_id},
+                         timeout=TIMEOUT_SECONDS_JENKINS_REQUEST).raise_for_status()
+
+        response = self.session.get(f"{self.endpoint}/sse-gateway/listen/{client_id}", stream=True,
+                                    headers={'Accept': 'text/event-stream'},
+                                    timeout=(TIMEOUT_SECONDS_JENKINS_REQUEST, None))
+        response.raise_for_status()
+        with response:
+            for event in SSEClient(response).events():
+                if event.event == 'open':
+                    # The stream has to be open before the gateway accepts subscriptions for it
+                    subscriptions = {
+                        'dispatcherId': orjson.loads(event.data)['dispatcherId'],
+                        'subscribe': [{'jenkins_channel': channel, name_field: job_name, 'jenkins_event': event_name}
+                                      for channel, (name_field, event_names) in BUILD_EVENTS.items()
+                                      for event_name in event_names
+                                      for job_name in job_names],
+                        'unsubscribe': [],
+                    }
+                    self.session.post(f"{self.endpoint}/sse-gateway/configure", params={'batchId': 0},
+                                      json=subscriptions, timeout=TIMEOUT_SECONDS_JENKINS_REQUEST).raise_for_status()
+                elif event.event in BUILD_EVENTS:
+                    yield event.event, orjson.loads(event.data)
+
+
+def build_graph(aliases: dict[str, str], dependencies: list[tuple[str, str]]) -> dict[str, Node]:
+    name_node_mapping = {alias: Node(alias) for alias in aliases}
 
     for dep in dependencies:
         src_node = name_node_mapping.get(dep[0])
@@ -92,14 +216,14 @@ def build_graph(aliases: dict[str, str], dependencies: list[list[int]]) -> dict[
     return name_node_mapping
 
 
-def get_topo_sort(start_node: str) -> list[list[Node]]:
-    layers = []
+def get_topo_sort(start_node: Node) -> list[list[Node]]:
+    if start_node is None:
+        return []
 
+    layers = []
     current_queue = [start_node]
-    next_queue = []
-
-    while len(current_queue) != 0:
-        layers.append(current_queue[:])
+    while current_queue:
+        layers.append(current_queue)
         next_queue = []
         for node in current_queue:
             for child in node.children:
@@ -111,24 +235,23 @@ def get_topo_sort(start_node: str) -> list[list[Node]]:
     return layers
 
 
-def init_jenkins(endpoint: str, auth: Authentication):
-    return Jenkins(endpoint, auth.username, auth.api_token)
+def init_jenkins(endpoint: str, auth: Authentication) -> JenkinsClient:
+    return JenkinsClient(endpoint, auth)
 
 
-def get_next_build_num(jenkins: Jenkins, job_name: str):
-    return jenkins.get_job_info(job_name)['nextBuildNumber']
+def get_next_build_num(jenkins: JenkinsClient, job_name: str):
+    return jenkins.next_build_num(job_name)
 
 
 def write_json(file_name: str, data):
-    with open(file_name, 'w', encoding='utf-8') as f:
-        f.write(json.dumps(data, indent=2))
+    Path(file_name).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
 
-def build_job(jenkins: Jenkins, job_name: str):
+def build_job(jenkins: JenkinsClient, job_name: str):
     jenkins.build_job(job_name)
 
 
-def generate_table(build_items: list[BuildItem]) -> Table:
+def generate_table(build_items: list[BuildItem]) -> tuple[Table, dict[BuildItem, list[Text]]]:
     table = Table(box=None, show_edge=False)
     table.add_column("Job", justify="left", no_wrap=True, width=25)
     table.add_column("Build", justify="left", no_wrap=True, width=8)
@@ -136,36 +259,39 @@ def generate_table(build_items: list[BuildItem]) -> Table:
     table.add_column("Stage", justify="left", no_wrap=True, width=25)
     table.add_column("Duration (s)", justify="right", no_wrap=True, width=15)
 
+    # Keep the cells of each row so they can be updated in place on every refresh
+    rows = {}
     for item in build_items:
-        table.add_row(item.job_name, f"#{item.build_num}", item.status, item.stage, str(item.duration))
+        cells = [Text(item.job_name), Text(f"#{item.build_num}"), Text(item.status), Text(item.stage),
+                 Text(str(item.duration))]
+        table.add_row(*cells)
+        rows[item] = cells
 
-    return table
+    return table, rows
 
 
-def resolve_statuses(statuses: list[str], ignore_failed: bool) -> BuildStatus:
-    if statuses and statuses.count("SUCCESS") == len(statuses):
-        return BuildStatus.SUCCESS
-    if not ignore_failed and statuses.count('ABORTED') > 0 or statuses.count('FAILED') > 0:
+def update_table_row(cells: list[Text], item: BuildItem):
+    cells[2].plain = item.status
+    cells[3].plain = item.stage
+    cells[4].plain = str(item.duration)
+
+
+def resolve_statuses(counts: Counter, pending_count: int, ignore_failed: bool) -> BuildStatus:
+    failed_count = counts['FAILED'] + counts['ABORTED']
+    # With ignore_failed, a failed job only ends the phase once every other job has finished too
+    if failed_count and (not ignore_failed or pending_count == 0):
         return BuildStatus.FAILED
+    if pending_count == 0:
+        return BuildStatus.SUCCESS
     return BuildStatus.IN_PROGRESS
 
 
 def process_aliases(data: list[dict[str, str]]) -> dict[str, str]:
-    aliases = {}
-    if data != None:
-        for pair in data:
-            for alias, job_name in pair.items():
-                aliases[alias] = job_name
-    return aliases
+    return {alias: job_name for pair in data or [] for alias, job_name in pair.items()}
 
 
-def process_dependencies(data: list[dict[str, str]]) -> list[list[int]]:
-    dependencies = []
-    if data != None:
-        for pair in data:
-            for src_alias, dst_alias in pair.items():
-                dependencies.append((src_alias, dst_alias))
-    return dependencies
+def process_dependencies(data: list[dict[str, str]]) -> list[tuple[str, str]]:
+    return [(src_alias, dst_alias) for pair in data or [] for src_alias, dst_alias in pair.items()]
 
 
 def read_conf_file(file_name: str) -> Config:
@@ -184,17 +310,20 @@ def read_conf_file(file_name: str) -> Config:
     config.endpoint = endpoint
     config.auth.username = auth['username']
     config.auth.api_token = auth['api-token']
-    config.aliases = process_aliases(data['aliases'])
-    config.dependencies = process_dependencies(data['dependencies'])
+    config.aliases = process_aliases(data.get('aliases'))
+    config.dependencies = process_dependencies(data.get('dependencies'))
     return config
 
 
-def init_build_items(nodes: list[Node], aliases: dict[str, str], jenkins: Jenkins) -> list[BuildItem]:
+def init_build_items(nodes: list[Node], aliases: dict[str, str], jenkins: JenkinsClient) -> list[BuildItem]:
+    job_names = [aliases[node.name] for node in nodes]
+    build_nums = executor.map(lambda job_name: get_next_build_num(jenkins, job_name), job_names)
+
     build_items = []
-    for node in nodes:
+    for job_name, build_num in zip(job_names, build_nums):
         build_item = BuildItem()
-        build_item.job_name = aliases[node.name]
-        build_item.build_num = get_next_build_num(jenkins, build_item.job_name)
+        build_item.job_name = job_name
+        build_item.build_num = build_num
         build_item.status = 'INITIATED'
         build_item.stage = '?'
 
@@ -202,14 +331,16 @@ def init_build_items(nodes: list[Node], aliases: dict[str, str], jenkins: Jenkin
     return build_items
 
 
-def submit_build_and_wait(build_items: list[BuildItem], jenkins: Jenkins):
-    threads = []
-    for item in build_items:
-        thread = threading.Thread(target=build_job, args=(jenkins, item.job_name))
-        thread.start()
-        threads.append(thread)
-    for t in threads:
-        t.join()
+def submit_build(item: BuildItem, jenkins: JenkinsClient):
+    try:
+        build_job(jenkins, item.job_name)
+    except Exception:
+        log.error(f"Failed to submit build for job {item.job_name}", exc_info=True)
+        item.status = 'FAILED'
+
+
+def submit_build_and_wait(build_items: list[BuildItem], jenkins: JenkinsClient):
+    list(executor.map(lambda item: submit_build(item, jenkins), build_items))
 
 
 def update_build_item_from_stage_info(item: BuildItem, stage_info: dict[str, str]):
@@ -221,56 +352,114 @@ def update_build_item_from_stage_info(item: BuildItem, stage_info: dict[str, str
         item.stage = stages[-1]['name']
 
 
-def get_build_stage_info(item: BuildItem, jenkins: Jenkins) -> dict[str, str]:
-    stage_info = {}
-    try_count = 0
-    while not stage_info and try_count < RETRIES_COUNT_GET_BUILD_STAGE:
-        stage_info = jenkins.get_build_stages(item.job_name, item.build_num)
-        try_count += 1
-        time.sleep(RETRIES_INTERVAL_SECONDS_GET_BUILD_STAGE)
-
-    if not stage_info:
-        raise IOError(f"Failed to get build stage info for job {item.job_name}")
+def get_build_stage_info(item: BuildItem, jenkins: JenkinsClient) -> Optional[dict[str, str]]:
+    stage_info = jenkins.build_stages(item.job_name, item.build_num)
+    if stage_info == {}:
+        # Not started yet, report no change and let the polling schedule try again until the deadline
+        if time.monotonic() >= item.start_deadline:
+            raise IOError(f"Failed to get build stage info for job {item.job_name}")
+        return None
     return stage_info
 
 
-def filter_excluded_nodes(build_phases: list[list[Node]], exclude_aliases: set[str]) -> list[list[Node]]:
+def refresh_build_item(item: BuildItem, jenkins: JenkinsClient) -> bool:
+    last_state = (item.status, item.stage)
+    last_duration = item.duration
+    try:
+        stage_info = get_build_stage_info(item, jenkins)
+        if stage_info is not None:
+            update_build_item_from_stage_info(item, stage_info)
+    except Exception:
+        log.error("Failed to update build status", exc_info=True)
+        item.status = 'FAILED'
+
+    # Back off while the job sits in the same stage, poll fast again once it moves on
+    if (item.status, item.stage) == last_state:
+        item.poll_interval = min(item.poll_interval * 2, MAX_INTERVAL_SECONDS_REFRESH_BUILD)
+    else:
+        item.poll_interval = INTERVAL_SECONDS_REFRESH_BUILD
+    item.next_poll_time = time.monotonic() + item.poll_interval
+    if item.status == 'INITIATED':
+        # Don't let the backoff push the check past the deadline for the build to start
+        item.next_poll_time = min(item.next_poll_time, item.start_deadline)
+
+    return (item.status, item.stage) != last_state or item.duration != last_duration
+
+
+def listen_build_events(jenkins: JenkinsClient, job_names: set[str], build_events: queue.Queue):
+    try:
+        for channel, event in jenkins.build_events(job_names):
+            # Step level events would defeat the polling backoff, only transitions wake the refresh loop
+            name_field, event_names = BUILD_EVENTS[channel]
+            if event.get('jenkins_event') in event_names and event.get(name_field) in job_names:
+                build_events.put(event[name_field])
+    except Exception:
+        log.warning("Build event stream unavailable, falling back to polling", exc_info=True)
+    else:
+        log.warning("Build event stream closed, falling back to polling")
+
+
+def wait_for_build_events(build_events: queue.Queue, pending_items: list[BuildItem]):
+    # Sleep until the next scheduled poll, or until Jenkins pushes an event for one of the jobs
+    next_poll_time = min(item.next_poll_time for item in pending_items)
+    try:
+        job_names = {build_events.get(timeout=max(0, next_poll_time - time.monotonic()))}
+    except queue.Empty:
+        return
+
+    # Take every event that arrived together so they are handled in the same tick
+    while not build_events.empty():
+        job_names.add(build_events.get_nowait())
+    for item in pending_items:
+        if item.job_name in job_names:
+            item.next_poll_time = 0
+
+
+def filter_excluded_nodes(build_phases: list[list[Node]], exclude_aliases: frozenset[str]) -> list[list[Node]]:
     result = []
     for nodes in build_phases:
-        nodes_copy = set(nodes)
-        for node in nodes:
-            if node.name in exclude_aliases:
-                nodes_copy.remove(node)
-        if nodes_copy:
-            result.append(nodes_copy)
+        kept_nodes = [node for node in nodes if node.name not in exclude_aliases]
+        if kept_nodes:
+            result.append(kept_nodes)
     return result
 
 
-def build_phase(nodes: list[Node], aliases: dict[str, str], jenkins: Jenkins, ignore_failed: bool) -> BuildStatus:
+def build_phase(nodes: list[Node], aliases: dict[str, str], jenkins: JenkinsClient, build_events: queue.Queue,
+                ignore_failed: bool) -> BuildStatus:
     build_items = init_build_items(nodes, aliases, jenkins)
     submit_build_and_wait(build_items, jenkins)
-
-    phase_status = BuildStatus.IN_PROGRESS
-    with Live(generate_table(build_items)) as live:
-        while True:
-            time.sleep(INTERVAL_SECONDS_REFRESH_BUILD)
-
-            statuses = []
-            for item in build_items:
-                if item.status not in ['FAILED', 'ABORTED', 'SUCCESS']:
-                    try:
-                        stage_info = get_build_stage_info(item, jenkins)
-                        update_build_item_from_stage_info(item, stage_info)
-                    except Exception:
-                        log.error("Failed to update build status", exc_info=True)
-                        item.status = 'FAILED'
-                statuses.append(item.status)
-
-            live.update(generate_table(build_items))
-
-            phase_status = resolve_statuses(statuses, ignore_failed)
-            if phase_status in [BuildStatus.FAILED, BuildStatus.SUCCESS]:
-                break
+    for item in build_items:
+        item.next_poll_time = time.monotonic() + item.poll_interval
+        item.start_deadline = time.monotonic() + TIMEOUT_SECONDS_START_BUILD
+
+    # Finished jobs leave pending_items and are only tallied in finished_counts, jobs that failed to submit start there
+    pending_items = [item for item in build_items if item.status not in TERMINAL_STATUSES]
+    finished_counts = Counter(item.status for item in build_items if item.status in TERMINAL_STATUSES)
+
+    phase_status = resolve_statuses(finished_counts, len(pending_items), ignore_failed)
+    table, rows = generate_table(build_items)
+    with Live(table, auto_refresh=False) as live:
+        while phase_status == BuildStatus.IN_PROGRESS:
+            wait_for_build_events(build_events, pending_items)
+
+            # Poll all due jobs concurrently so a tick costs one round-trip instead of one per job
+            now = time.monotonic()
+            due_items = [item for item in pending_items if item.next_poll_time <= now]
+            changes = list(executor.map(lambda item: refresh_build_item(item, jenkins), due_items))
+
+            # Only redraw when a poll actually brought something new
+            changed_items = [item for item, changed in zip(due_items, changes) if changed]
+            for item in changed_items:
+                update_table_row(rows[item], item)
+            if changed_items:
+                live.refresh()
+
+            finished_items = [item for item in changed_items if item.status in TERMINAL_STATUSES]
+            if finished_items:
+                finished_counts.update(item.status for item in finished_items)
+                pending_items = [item for item in pending_items if item.status not in TERMINAL_STATUSES]
+
+            phase_status = resolve_statuses(finished_counts, len(pending_items), ignore_failed)
 
     if not ignore_failed and phase_status == BuildStatus.FAILED:
         return BuildStatus.FAILED
@@ -284,7 +473,7 @@ def build_phase(nodes: list[Node], aliases: dict[str, str], jenkins: Jenkins, ig
 @click.option('-e', '--exclude-aliases', multiple=True, help='List of aliases to be excluded')
 @click.option('--ignore-failed', is_flag=True, default=False,
               help='Ignore failed jobs on build progress. Default: false (ie. fail-fast)')
-def main(config_file: str, start_point: str, exclude_aliases: set[str], ignore_failed: bool):
+def main(config_file: str, start_point: str, exclude_aliases: tuple[str, ...], ignore_failed: bool):
     log.info(
         f'config_file={config_file}, start_point={start_point}, exclude_aliases={exclude_aliases}, ignore_failed={ignore_failed}')
 
@@ -304,7 +493,7 @@ def main(config_file: str, start_point: str, exclude_aliases: set[str], ignore_f
     build_phases = get_topo_sort(graph.get(start_point))
 
     if exclude_aliases:
-        build_phases = filter_excluded_nodes(build_phases, exclude_aliases)
+        build_phases = filter_excluded_nodes(build_phases, frozenset(exclude_aliases))
 
     if not build_phases:
         print('No job built!')
@@ -313,11 +502,16 @@ def main(config_file: str, start_point: str, exclude_aliases: set[str], ignore_f
     total_jobs = sum([len(p) for p in build_phases])
     print(f'Total jobs: {total_jobs}. Total phases: {len(build_phases)}\n')
 
+    # Jenkins pushes job events when the SSE Gateway plugin is installed, polling still runs without it
+    build_events = queue.Queue()
+    job_names = {config.aliases[node.name] for nodes in build_phases for node in nodes}
+    threading.Thread(target=listen_build_events, args=(jenkins, job_names, build_events), daemon=True).start()
+
     final_status = BuildStatus.SUCCESS
 
     for phase in range(len(build_phases)):
         print(f"Build phase #{phase + 1}:")
-        phase_status = build_phase(build_phases[phase], config.aliases, jenkins, ignore_failed)
+        phase_status = build_phase(build_phases[phase], config.aliases, jenkins, build_events, ignore_failed)
         if phase_status == BuildStatus.FAILED:
             final_status = BuildStatus.FAILED
             break
@@ -325,4 +519,7 @@ def main(config_file: str, start_point: str, exclude_aliases: set[str], ignore_f
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        executor.shutdown(wait=True)
\ No newline at end of file